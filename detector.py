@@ -5,16 +5,21 @@ import requests
 import json
 from datetime import datetime
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from wire_format import DetectionEncoder, CONTENT_TYPE_JSON
 
 class YOLODetector:
-    def __init__(self, model_path: str = "yolov8n.pt", server_url: str = None):
+    def __init__(self, model_path: str = "yolov8n.pt", server_url: str = None,
+                 wire_format: str = "json", delta: bool = False, keyframe_interval: int = 30):
         """
         Initialize YOLO detector
         
         Args:
             model_path: Path to YOLO model weights (default: yolov8n.pt - nano model)
             server_url: URL of the server to send detection results
+            wire_format: Payload format sent to the server ('json' or 'binary')
+            delta: Only send added, removed or moved objects between keyframes
+            keyframe_interval: Frames between full keyframes in delta mode
         """
         # Load YOLO model
         self.model = YOLO(model_path)
@@ -26,6 +31,10 @@ class YOLODetector:
         # Initialize request session for better performance
         self.session = requests.Session()
         
+        # Encoder for the payload sent to the server
+        self.encoder = DetectionEncoder(self.model.names, wire_format=wire_format,
+                                        delta=delta, keyframe_interval=keyframe_interval)
+        
     def process_frame(self, frame: np.ndarray) -> Dict[str, Any]:
         """
         Process a single frame and return detection results
@@ -54,35 +63,51 @@ class YOLODetector:
             })
         
         # Prepare result payload
+        now = datetime.now()
         result = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now.isoformat(),
             'detections': detections,
             'frame_shape': frame.shape[:2]
         }
         
-        # Send results to server if URL is provided
-        if self.server_url and detections:
-            self._send_to_server(result)
+        # Send results to server if URL is provided (delta mode also reports removals)
+        if self.server_url and (detections or self.encoder.delta):
+            self._send_to_server(result, now.timestamp())
             
         return result
     
-    def _send_to_server(self, data: Dict[str, Any]) -> None:
+    def _send_to_server(self, data: Dict[str, Any], timestamp: Optional[float] = None) -> None:
         """
         Send detection results to server
         
         Args:
             data: Detection results to send
+            timestamp: POSIX timestamp of the results
         """
+        payload = self.encoder.encode(data, timestamp)
+        if payload is None:
+            # Nothing changed since the previous delta
+            return
+        
         try:
             response = self.session.post(
                 self.server_url,
-                json=data,
-                headers={'Content-Type': 'application/json'},
+                data=payload,
+                headers={'Content-Type': self.encoder.content_type},
                 timeout=5
             )
+            if response.status_code == 415 and self.encoder.content_type != CONTENT_TYPE_JSON:
+                # Receiver only understands plain JSON; use it for the rest of the session
+                print(f"Server does not accept {self.encoder.content_type}, "
+                      f"falling back to {CONTENT_TYPE_JSON}")
+                self.encoder = DetectionEncoder(self.model.names)
+                self._send_to_server(data, timestamp)
+                return
             response.raise_for_status()
         except requests.exceptions.RequestException as e:
             print(f"Error sending data to server: {str(e)}")
+            # The server may have missed a delta, so resync with a keyframe
+            self.encoder.reset()
             
     def draw_detections(self, frame: np.ndarray, detections: List[Dict[str, Any]]) -> np.ndarray:
         """
@@ -33,17 +33,6 @@ def process_frame(frame, detector, show_video=False):
         cv2.imshow('RTSP Stream with Detections', frame)
         cv2.waitKey(1)
 
-def frame_callback(frame):
-    """Simple callback to display frames"""
-    try:
-        cv2.imshow('RTSP Stream', frame)
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):  # Press 'q' to quit
-            cv2.destroyAllWindows()
-            sys.exit(0)
-    except Exception as e:
-        print(f"Error displaying frame: {str(e)}")
-
 #   .env file
 #       RTSP_URL=rtsp://192.168.1.113/stream1
 #       RTSP_USERNAME=your_username
@@ -57,6 +46,12 @@ def main():
                       help='Show video stream with detections')
     parser.add_argument('--server', type=str,
                       help='URL of the server to send detection results')
+    parser.add_argument('--wire-format', type=str, default='json', choices=['json', 'binary'],
+                      help='Payload format sent to the server (default: json)')
+    parser.add_argument('--delta', action='store_true',
+                      help='Only send added, removed or moved objects between keyframes')
+    parser.add_argument('--keyframe-interval', type=int, default=30,
+                      help='Frames between full keyframes in delta mode (default: 30)')
     args = parser.parse_args()
     
     # Load environment variables from .env file
@@ -75,15 +70,16 @@ def main():
     
     # Initialize YOLO detector
     print(f"Loading YOLO model: {args.model}")
-    # detector = YOLODetector(model_path=args.model, server_url=args.server)
+    detector = YOLODetector(model_path=args.model, server_url=args.server,
+                            wire_format=args.wire_format, delta=args.delta,
+                            keyframe_interval=args.keyframe_interval)
     
     # Create callback function for RTSP stream
-    # def frame_callback(frame):
-        # process_frame(frame, detector, args.show)
+    def detection_callback(frame):
+        process_frame(frame, detector, args.show)
     
     # Create RTSP stream instance with authentication
-    # stream = RTSPStream(rtsp_url, username, password, callback=frame_callback)
-    stream = RTSPStream(rtsp_url, username, password, callback=frame_callback)
+    stream = RTSPStream(rtsp_url, username, password, callback=detection_callback)
     
     try:
         # Start the stream
@@ -91,7 +87,7 @@ def main():
         stream.start()
         
         # Keep the main thread running
-        print("Press 'q' to quit")
+        print("Press Ctrl+C to quit")
         while True:
             time.sleep(0.1)
             
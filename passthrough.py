@@ -0,0 +1,245 @@
+import subprocess
+import threading
+import queue
+import shutil
+import struct
+import time
+import logging
+import urllib.parse
+from typing import Optional, List, Iterator
+from utils import mask_rtsp_url
+
+logger = logging.getLogger(__name__)
+
+# Boxes that make up the fragmented MP4 init segment
+INIT_BOXES = (b'ftyp', b'moov')
+
+class PassthroughRelay:
+    def __init__(self, rtsp_url: str, username: str, password: str, max_pending: int = 8,
+                 read_timeout: float = 10):
+        """
+        Relay the camera's compressed stream to viewers without decoding it
+
+        ffmpeg copies the H.264 stream into fragmented MP4, so each viewer
+        only costs a socket write and bandwidth stays at the camera bitrate.
+
+        ffmpeg has no other way to take RTSP credentials, so the
+        authenticated URL is passed on its command line and is visible to
+        local users through ps or /proc/<pid>/cmdline.
+
+        Args:
+            rtsp_url (str): The RTSP URL to connect to
+            username (str): Username for RTSP authentication
+            password (str): Password for RTSP authentication
+            max_pending (int): Fragments buffered per viewer before dropping
+            read_timeout (float): Seconds without data before ffmpeg is restarted
+        """
+        parsed_url = urllib.parse.urlparse(rtsp_url)
+        self.rtsp_url = f"{parsed_url.scheme}://{username}:{password}@{parsed_url.netloc}{parsed_url.path}"
+        self.max_pending = max_pending
+        self.read_timeout = read_timeout
+        self._last_data = time.monotonic()
+        self.process = None
+        self.is_running = False
+        self.thread = None
+        self.init_segment: Optional[bytes] = None
+        self._viewers: List[queue.Queue] = []
+        self._lock = threading.Lock()
+        self._init_ready = threading.Condition(self._lock)
+
+    @staticmethod
+    def is_available() -> bool:
+        """Check that ffmpeg is installed"""
+        return shutil.which('ffmpeg') is not None
+
+    def start(self):
+        """Start the relay in a separate thread"""
+        if self.is_running:
+            return
+
+        self.is_running = True
+        self.thread = threading.Thread(target=self._relay_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        """Stop the relay and disconnect all viewers"""
+        # Taken under the lock so the relay thread cannot start ffmpeg unseen
+        with self._lock:
+            self.is_running = False
+            process = self.process
+        if process:
+            process.kill()
+        if self.thread:
+            self.thread.join()
+        self._reset_viewers()
+
+    def _command(self) -> List[str]:
+        return [
+            'ffmpeg', '-loglevel', 'error',
+            '-rtsp_transport', 'tcp',
+            '-i', self.rtsp_url,
+            '-map', '0:v:0', '-c', 'copy', '-an',
+            '-f', 'mp4',
+            '-movflags', 'frag_keyframe+empty_moov+default_base_moof',
+            'pipe:1'
+        ]
+
+    def _relay_loop(self):
+        """Run ffmpeg and split its output into init segment and fragments"""
+        while self.is_running:
+            try:
+                with self._lock:
+                    if not self.is_running:
+                        break
+                    process = subprocess.Popen(self._command(), stdout=subprocess.PIPE,
+                                               stderr=subprocess.PIPE)
+                    self.process = process
+                log_thread = threading.Thread(target=self._log_stderr, args=(process.stderr,))
+                log_thread.daemon = True
+                log_thread.start()
+                self._last_data = time.monotonic()
+                watchdog = threading.Thread(target=self._watchdog, args=(process,))
+                watchdog.daemon = True
+                watchdog.start()
+
+                self._relay_boxes(process.stdout)
+
+                if self.is_running:
+                    logger.warning("Passthrough relay ended, restarting")
+            except Exception as e:
+                logger.error(f"Error in passthrough relay: {str(e)}")
+            finally:
+                with self._lock:
+                    process = self.process
+                    self.process = None
+                if process:
+                    process.kill()
+                    process.wait()
+                # A restarted ffmpeg has a new init segment, so viewers must reconnect
+                self._reset_viewers()
+
+            if self.is_running:
+                time.sleep(1)
+
+    def _relay_boxes(self, stream):
+        """Split ffmpeg output into the init segment and fragments for viewers"""
+        init_parts = []
+        fragment_parts = []
+        for box_type, box in self._read_boxes(stream):
+            self._last_data = time.monotonic()
+            if box_type in INIT_BOXES:
+                init_parts.append(box)
+                if box_type == b'moov':
+                    with self._lock:
+                        self.init_segment = b''.join(init_parts)
+                        self._init_ready.notify_all()
+            elif box_type == b'moof':
+                fragment_parts = [box]
+            elif fragment_parts:
+                fragment_parts.append(box)
+                if box_type == b'mdat':
+                    # frag_keyframe makes every fragment start on a keyframe
+                    self._broadcast(b''.join(fragment_parts))
+                    fragment_parts = []
+
+    def _watchdog(self, process: subprocess.Popen):
+        """Kill ffmpeg if the camera stops sending without closing the connection"""
+        while process.poll() is None:
+            if time.monotonic() - self._last_data > self.read_timeout:
+                logger.warning(f"No data from ffmpeg for {self.read_timeout}s, restarting")
+                process.kill()
+                return
+            time.sleep(1)
+
+    @staticmethod
+    def _log_stderr(stream):
+        """Log ffmpeg errors (e.g. 401 or connection refused) without credentials"""
+        for line in stream:
+            line = line.decode('utf-8', errors='replace').strip()
+            if line:
+                logger.error(f"ffmpeg: {mask_rtsp_url(line)}")
+
+    @staticmethod
+    def _read_boxes(stream) -> Iterator[tuple]:
+        """Yield (type, bytes) for each top-level MP4 box"""
+        while True:
+            header = stream.read(8)
+            if len(header) < 8:
+                return
+            size, box_type = struct.unpack('>I4s', header)
+            if size == 1:
+                large = stream.read(8)
+                if len(large) < 8:
+                    return
+                header += large
+                size = struct.unpack('>Q', large)[0]
+            if size < len(header):
+                # size 0 (to end of file) or a corrupt size; restart ffmpeg
+                logger.error(f"Invalid MP4 box size {size} for {box_type!r}")
+                return
+            body = stream.read(size - len(header))
+            if len(body) < size - len(header):
+                return
+            yield box_type, header + body
+
+    def _broadcast(self, fragment: bytes):
+        with self._lock:
+            viewers = list(self._viewers)
+        for viewer in viewers:
+            try:
+                viewer.put_nowait(fragment)
+            except queue.Full:
+                # Slow viewer: skip this fragment, the next one starts on a keyframe
+                pass
+
+    def _reset_viewers(self):
+        with self._lock:
+            self.init_segment = None
+            viewers = self._viewers
+            self._viewers = []
+        for viewer in viewers:
+            try:
+                viewer.put_nowait(None)
+            except queue.Full:
+                # Make room for the end-of-stream marker
+                try:
+                    viewer.get_nowait()
+                except queue.Empty:
+                    pass
+                viewer.put_nowait(None)
+
+    def subscribe(self, timeout: float = 10) -> Optional[Iterator[bytes]]:
+        """
+        Register a viewer once the stream is ready
+
+        Args:
+            timeout (float): Seconds to wait for the init segment
+
+        Returns:
+            Generator yielding the init segment followed by media fragments,
+            or None if ffmpeg has not produced an init segment in time
+        """
+        viewer = queue.Queue(maxsize=self.max_pending)
+        with self._lock:
+            if not self._init_ready.wait_for(lambda: self.init_segment is not None, timeout):
+                return None
+            init_segment = self.init_segment
+            self._viewers.append(viewer)
+        return self._stream(viewer, init_segment)
+
+    def _stream(self, viewer: queue.Queue, init_segment: bytes) -> Iterator[bytes]:
+        try:
+            yield init_segment
+            while self.is_running:
+                try:
+                    fragment = viewer.get(timeout=1)
+                except queue.Empty:
+                    continue
+                if fragment is None:
+                    break
+                yield fragment
+        finally:
+            with self._lock:
+                if viewer in self._viewers:
+                    self._viewers.remove(viewer)
@@ -2,6 +2,7 @@ from flask import Flask, Response, jsonify
 import cv2
 import numpy as np
 from rtsp_stream import RTSPStream
+from passthrough import PassthroughRelay
 import threading
 import queue
 import time
@@ -9,9 +10,8 @@ from dotenv import load_dotenv
 import os
 import argparse
 import logging
-import re
 import socket
-from utils import get_network_interfaces
+from utils import get_network_interfaces, mask_rtsp_url
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -22,14 +22,7 @@ app = Flask(__name__)
 # Global variables
 frame_queue = queue.Queue(maxsize=2)
 is_running = True
-
-def mask_rtsp_url(url):
-    """Mask sensitive information in RTSP URL"""
-    if not url:
-        return "None"
-    # Replace username and password with asterisks
-    masked_url = re.sub(r'://[^:]+:[^@]+@', '://****:****@', url)
-    return masked_url
+relay = None
 
 def validate_rtsp_credentials(url, username, password):
     """Validate RTSP credentials without exposing them"""
@@ -84,12 +77,26 @@ def video_feed():
     return Response(generate_frames(),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@app.route('/stream.mp4')
+def passthrough_feed():
+    """Passthrough route relaying the camera's compressed stream as fragmented MP4"""
+    if relay is None:
+        return jsonify({'error': 'Passthrough mode is not enabled'}), 404
+    
+    stream = relay.subscribe()
+    if stream is None:
+        logger.warning("Passthrough stream not ready")
+        return jsonify({'error': 'Passthrough stream is not ready'}), 503
+    return Response(stream, mimetype='video/mp4')
+
 def main():
     parser = argparse.ArgumentParser(description='Edge device server for video streaming')
     parser.add_argument('--port', type=int, default=8000,
                       help='Port to run the server on (default: 8000)')
     parser.add_argument('--host', type=str, default='0.0.0.0',
                       help='Host to run the server on (default: 0.0.0.0)')
+    parser.add_argument('--passthrough', action='store_true',
+                      help='Relay the camera stream without re-encoding at /stream.mp4 (requires ffmpeg)')
     args = parser.parse_args()
     
     # Load environment variables
@@ -125,6 +132,16 @@ def main():
         logger.error("Failed to start RTSP stream (credentials may be invalid)")
         return
     
+    # Start passthrough relay for viewers that only want live video
+    global relay
+    if args.passthrough:
+        if PassthroughRelay.is_available():
+            relay = PassthroughRelay(rtsp_url, username, password)
+            relay.start()
+            logger.info("Passthrough relay started at /stream.mp4")
+        else:
+            logger.error("Passthrough mode requires ffmpeg, which was not found")
+    
     try:
         # Get and log available network interfaces
         interfaces = get_network_interfaces()
@@ -143,6 +160,8 @@ def main():
         global is_running
         is_running = False
         stream.stop()
+        if relay:
+            relay.stop()
         logger.info("Server stopped")
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+import io
+import os
+import sys
+import struct
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passthrough import PassthroughRelay
+
+
+def box(box_type, payload=b''):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def make_relay(max_pending=8):
+    relay = PassthroughRelay('rtsp://camera/stream', 'user', 'pass', max_pending=max_pending)
+    relay.is_running = True
+    return relay
+
+
+def test_read_boxes_splits_top_level_boxes():
+    data = box(b'ftyp', b'isom') + box(b'moov', b'm' * 20)
+    boxes = list(PassthroughRelay._read_boxes(io.BytesIO(data)))
+    assert [box_type for box_type, _ in boxes] == [b'ftyp', b'moov']
+    assert b''.join(raw for _, raw in boxes) == data
+
+
+def test_read_boxes_handles_large_size():
+    data = struct.pack('>I4sQ', 1, b'mdat', 20) + b'abcd'
+    assert list(PassthroughRelay._read_boxes(io.BytesIO(data))) == [(b'mdat', data)]
+
+
+def test_read_boxes_stops_on_corrupt_size():
+    data = box(b'ftyp', b'isom') + struct.pack('>I4s', 4, b'moof') + b'x' * 100
+    boxes = list(PassthroughRelay._read_boxes(io.BytesIO(data)))
+    assert [box_type for box_type, _ in boxes] == [b'ftyp']
+
+
+def test_init_segment_and_fragments():
+    relay = make_relay()
+    ftyp, moov = box(b'ftyp', b'isom'), box(b'moov', b'm' * 20)
+    fragments = [box(b'moof', b'f' * 10) + box(b'mdat', bytes([i]) * 50) for i in range(3)]
+
+    # Register the viewer once the init segment is known
+    relay._relay_boxes(io.BytesIO(ftyp + moov))
+    assert relay.init_segment == ftyp + moov
+    stream = relay.subscribe(timeout=0)
+
+    relay._relay_boxes(io.BytesIO(b''.join(fragments)))
+    relay._reset_viewers()
+    assert list(stream) == [ftyp + moov] + fragments
+
+
+def test_full_viewer_queue_drops_fragments():
+    relay = make_relay(max_pending=2)
+    relay._relay_boxes(io.BytesIO(box(b'ftyp') + box(b'moov')))
+    stream = relay.subscribe(timeout=0)
+    viewer = relay._viewers[0]
+
+    fragments = [box(b'moof') + box(b'mdat', bytes([i])) for i in range(5)]
+    relay._relay_boxes(io.BytesIO(b''.join(fragments)))
+    assert viewer.qsize() == 2
+    assert [viewer.get_nowait(), viewer.get_nowait()] == fragments[:2]
+    stream.close()
+
+
+def test_reset_viewers_ends_full_queue():
+    relay = make_relay(max_pending=2)
+    relay._relay_boxes(io.BytesIO(box(b'ftyp') + box(b'moov')))
+    stream = relay.subscribe(timeout=0)
+    viewer = relay._viewers[0]
+    relay._relay_boxes(io.BytesIO((box(b'moof') + box(b'mdat')) * 2))
+    assert viewer.full()
+
+    relay._reset_viewers()
+    assert relay.init_segment is None
+    assert relay._viewers == []
+    assert viewer.queue[-1] is None
+    stream.close()
+
+
+def test_subscribe_times_out_without_init_segment():
+    relay = make_relay()
+    assert relay.subscribe(timeout=0.05) is None
+    assert relay._viewers == []
@@ -0,0 +1,139 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wire_format import (DetectionEncoder, DetectionDecoder, CONTENT_TYPE_JSON,
+                         CONTENT_TYPE_BINARY, CONTENT_TYPE_JSON_DELTA, HEADER)
+
+CLASS_NAMES = {0: 'person', 1: 'car'}
+PERSON = [10, 10, 100, 200]
+CAR = [300, 300, 400, 380]
+
+
+def make_result(*detections):
+    return {
+        'timestamp': '2026-01-01T12:00:00.123000',
+        'detections': [{'class': name, 'confidence': 0.9, 'bbox': list(bbox)}
+                       for name, bbox in detections],
+        'frame_shape': (480, 640)
+    }
+
+
+def boxes(decoded):
+    return [(det['class'], det['bbox']) for det in decoded['detections']]
+
+
+@pytest.mark.parametrize('wire_format', ['json', 'binary'])
+def test_delta_round_trip(wire_format):
+    encoder = DetectionEncoder(CLASS_NAMES, wire_format=wire_format, delta=True)
+    decoder = DetectionDecoder(CLASS_NAMES)
+
+    def send(*detections):
+        payload = encoder.encode(make_result(*detections))
+        return payload if payload is None else decoder.decode(payload, encoder.content_type)
+
+    # Keyframe
+    decoded = send(('person', PERSON), ('car', CAR))
+    assert boxes(decoded) == [('person', PERSON), ('car', CAR)]
+    assert decoded['frame_shape'] == (480, 640)
+    assert decoded['timestamp'] == '2026-01-01T12:00:00.123000'
+
+    # Sub-threshold jitter is not sent
+    assert send(('person', [10.4, 11, 100, 200]), ('car', CAR)) is None
+
+    # Move
+    moved = [20, 10, 110, 200]
+    assert boxes(send(('person', moved), ('car', CAR))) == [('person', moved), ('car', CAR)]
+
+    # Remove
+    assert boxes(send(('car', CAR))) == [('car', CAR)]
+
+    # Re-add reuses the free slot
+    other = [500, 10, 600, 200]
+    assert boxes(send(('car', CAR), ('person', other))) == [('person', other), ('car', CAR)]
+
+    assert boxes(send()) == []
+
+
+def test_keyframe_interval():
+    encoder = DetectionEncoder(CLASS_NAMES, wire_format='binary', delta=True, keyframe_interval=3)
+    flags = []
+    for _ in range(7):
+        payload = encoder.encode(make_result(('car', CAR)))
+        flags.append(None if payload is None else HEADER.unpack_from(payload, 0)[1])
+    assert flags == [1, None, None, 1, None, None, 1]
+
+
+def test_gap_raises_and_recovers_at_keyframe():
+    encoder = DetectionEncoder(CLASS_NAMES, wire_format='binary', delta=True, keyframe_interval=4)
+    decoder = DetectionDecoder(CLASS_NAMES)
+    decoder.decode(encoder.encode(make_result(('car', CAR))), CONTENT_TYPE_BINARY)
+
+    # Lost message
+    encoder.encode(make_result(('car', CAR), ('person', PERSON)))
+    delta = encoder.encode(make_result(('person', PERSON)))
+    with pytest.raises(ValueError, match='Sequence gap'):
+        decoder.decode(delta, CONTENT_TYPE_BINARY)
+
+    # Deltas are rejected until the next keyframe
+    delta = encoder.encode(make_result())
+    with pytest.raises(ValueError, match='before a keyframe'):
+        decoder.decode(delta, CONTENT_TYPE_BINARY)
+
+    keyframe = encoder.encode(make_result(('car', CAR)))
+    assert boxes(decoder.decode(keyframe, CONTENT_TYPE_BINARY)) == [('car', CAR)]
+
+
+def test_seq_wraps_around():
+    encoder = DetectionEncoder(CLASS_NAMES, wire_format='binary', delta=True)
+    decoder = DetectionDecoder(CLASS_NAMES)
+    encoder._seq = 0xFFFF
+    decoder.decode(encoder.encode(make_result(('car', CAR))), CONTENT_TYPE_BINARY)
+    payload = encoder.encode(make_result())
+    assert HEADER.unpack_from(payload, 0)[2] == 0
+    assert boxes(decoder.decode(payload, CONTENT_TYPE_BINARY)) == []
+
+
+def test_coordinates_clip_to_int16():
+    encoder = DetectionEncoder(CLASS_NAMES, wire_format='binary')
+    payload = encoder.encode(make_result(('car', [-40000, 5.6, 40000, 70000])))
+    decoded = DetectionDecoder(CLASS_NAMES).decode(payload, CONTENT_TYPE_BINARY)
+    assert decoded['detections'][0]['bbox'] == [-32768, 6, 32767, 32767]
+
+
+def test_unknown_class_name():
+    encoder = DetectionEncoder(CLASS_NAMES, wire_format='binary')
+    with pytest.raises(ValueError, match='Unknown class name'):
+        encoder.encode(make_result(('dog', PERSON)))
+
+
+def test_truncated_binary_payload():
+    payload = DetectionEncoder(CLASS_NAMES, wire_format='binary').encode(make_result(('car', CAR)))
+    decoder = DetectionDecoder(CLASS_NAMES)
+    for body in (b'', payload[:HEADER.size - 1], payload[:-1]):
+        with pytest.raises(ValueError, match='Truncated'):
+            decoder.decode(body, CONTENT_TYPE_BINARY)
+
+
+@pytest.mark.parametrize('body', [
+    b'not json',
+    b'[]',
+    b'{"seq": 0, "keyframe": true, "timestamp": "t", "frame_shape": [480, 640], "upserts": []}',
+    b'{"seq": 0, "keyframe": true, "timestamp": "t", "frame_shape": [480, 640], '
+    b'"upserts": [[0, 1, 230]], "removed": []}',
+    b'{"seq": 0, "keyframe": true, "timestamp": "t", "frame_shape": 480, '
+    b'"upserts": [], "removed": []}',
+])
+def test_malformed_delta_json_payload(body):
+    with pytest.raises(ValueError):
+        DetectionDecoder(CLASS_NAMES).decode(body, CONTENT_TYPE_JSON_DELTA)
+
+
+def test_plain_json_is_unchanged():
+    encoder = DetectionEncoder(CLASS_NAMES)
+    result = make_result(('person', [1.5, 2.5, 3.5, 4.5]))
+    assert encoder.content_type == CONTENT_TYPE_JSON
+    decoded = DetectionDecoder().decode(encoder.encode(result), 'application/json; charset=utf-8')
+    assert decoded['detections'] == result['detections']
@@ -1,8 +1,17 @@
 import socket
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+def mask_rtsp_url(url):
+    """Mask sensitive information in RTSP URL"""
+    if not url:
+        return "None"
+    # Replace username and password with asterisks
+    masked_url = re.sub(r'://[^:]+:[^@]+@', '://****:****@', url)
+    return masked_url
+
 def get_network_interfaces():
     """Get all available network interface IP addresses"""
     interfaces = []
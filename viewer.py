@@ -51,12 +51,22 @@ class StreamViewer:
         
     def _capture_rtsp(self):
         """Capture frames directly from RTSP stream"""
-        cap = cv2.VideoCapture(self.rtsp_url)
+        cap = None
         
         while self.is_running:
+            if cap is None or not cap.isOpened():
+                cap = cv2.VideoCapture(self.rtsp_url)
+                if not cap.isOpened():
+                    print("Failed to open RTSP stream")
+                    time.sleep(1)
+                    continue
+            
             ret, frame = cap.read()
             if not ret:
+                # Reopen the stream, e.g. after the edge relay restarts
                 print("Failed to read frame from RTSP stream")
+                cap.release()
+                cap = None
                 time.sleep(1)
                 continue
                 
@@ -64,7 +74,8 @@ class StreamViewer:
             if not self.frame_queue.full():
                 self.frame_queue.put(frame)
                 
-        cap.release()
+        if cap:
+            cap.release()
         
     def _capture_edge(self):
         """Capture frames from edge device"""
@@ -144,9 +155,19 @@ def main():
                       help='URL of the edge device (e.g., http://raspberry-pi:8000)')
     parser.add_argument('--rtsp', type=str,
                       help='Optional direct RTSP URL (if you want to bypass edge device)')
+    parser.add_argument('--passthrough', action='store_true',
+                      help="Play the edge device's passthrough stream (/stream.mp4) instead of MJPEG")
     args = parser.parse_args()
     
-    viewer = StreamViewer(args.edge, args.rtsp)
+    if args.passthrough and args.rtsp:
+        parser.error('--passthrough cannot be combined with --rtsp')
+    
+    # The passthrough stream is read like a direct RTSP stream
+    rtsp_url = args.rtsp
+    if args.passthrough:
+        rtsp_url = f"{args.edge.rstrip('/')}/stream.mp4"
+    
+    viewer = StreamViewer(args.edge, rtsp_url)
     try:
         viewer.start()
     except KeyboardInterrupt:
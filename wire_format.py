@@ -0,0 +1,314 @@
+import json
+import struct
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Any
+
+# Content types used to negotiate the wire format with the receiving side.
+# Plain JSON stays the default so existing clients keep working.
+CONTENT_TYPE_JSON = 'application/json'
+CONTENT_TYPE_JSON_DELTA = 'application/vnd.edge-bridge.delta+json'
+CONTENT_TYPE_BINARY = 'application/vnd.edge-bridge.detections'
+
+WIRE_FORMATS = ('json', 'binary')
+
+DELTA_JSON_KEYS = frozenset(('seq', 'keyframe', 'timestamp', 'frame_shape', 'upserts', 'removed'))
+
+# Binary layout (little endian):
+#   header: version, flags, seq, timestamp (ms), height, width, n_upserts, n_removed
+#   upsert: slot, class_id, confidence (0-255), x1, y1, x2, y2 (int16 pixels)
+#   removed: slot
+BINARY_VERSION = 1
+FLAG_KEYFRAME = 0x01
+HEADER = struct.Struct('<BBHqHHHH')
+RECORD = struct.Struct('<HHBhhhh')
+REMOVED = struct.Struct('<H')
+
+INT16_MIN, INT16_MAX = -32768, 32767
+
+# (class_id, confidence 0-255, x1, y1, x2, y2)
+Record = Tuple[int, int, int, int, int, int]
+
+
+def _clip_int16(value: float) -> int:
+    value = round(value)
+    if INT16_MIN <= value <= INT16_MAX:
+        return value
+    return INT16_MIN if value < INT16_MIN else INT16_MAX
+
+
+def _iou(a: Record, b: Record) -> float:
+    """Intersection over union of the boxes of two records"""
+    _, _, ax1, ay1, ax2, ay2 = a
+    _, _, bx1, by1, bx2, by2 = b
+    ix = min(ax2, bx2) - max(ax1, bx1)
+    iy = min(ay2, by2) - max(ay1, by1)
+    if ix <= 0 or iy <= 0:
+        return 0.0
+    inter = ix * iy
+    union = (ax2 - ax1) * (ay2 - ay1) + (bx2 - bx1) * (by2 - by1) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def content_type_for(wire_format: str, delta: bool = False) -> str:
+    """Return the Content-Type header for a wire format"""
+    if wire_format not in WIRE_FORMATS:
+        raise ValueError(f"Unknown wire format: {wire_format}")
+    if wire_format == 'binary':
+        return CONTENT_TYPE_BINARY
+    return CONTENT_TYPE_JSON_DELTA if delta else CONTENT_TYPE_JSON
+
+
+class DetectionEncoder:
+    def __init__(self, class_names: Dict[int, str], wire_format: str = 'json',
+                 delta: bool = False, keyframe_interval: int = 30,
+                 move_threshold: int = 2, conf_threshold: float = 0.05,
+                 min_iou: float = 0.3):
+        """
+        Encode detection results for sending over the network
+
+        Args:
+            class_names: Mapping of class ID to class name (e.g. model.names)
+            wire_format: 'json' (default) or 'binary'
+            delta: Only send added, removed or moved objects
+            keyframe_interval: Send a full keyframe every N frames in delta mode
+            move_threshold: Pixel change below which an object counts as still
+            conf_threshold: Confidence change below which an object counts as still
+            min_iou: Minimum IoU to match an object with the previous message
+        """
+        self.content_type = content_type_for(wire_format, delta)
+        self.wire_format = wire_format
+        self.delta = delta
+        self.keyframe_interval = max(1, keyframe_interval)
+        self.move_threshold = move_threshold
+        self.conf_threshold = int(round(conf_threshold * 255))
+        self.min_iou = min_iou
+        self.class_names = class_names
+        self._class_ids = {name: class_id for class_id, name in class_names.items()}
+        self._seq = 0
+        self._frames_since_keyframe = 0
+        self._slots: Optional[Dict[int, Record]] = None
+
+    def reset(self):
+        """Force the next message to be a keyframe (e.g. after a failed send)"""
+        self._slots = None
+
+    def encode(self, result: Dict[str, Any], timestamp: Optional[float] = None) -> Optional[bytes]:
+        """
+        Encode a detection result
+
+        Args:
+            result: Result dictionary from YOLODetector.process_frame
+            timestamp: POSIX timestamp of the result (parsed from result if omitted)
+
+        Returns:
+            Encoded payload, or None if delta mode has nothing to send
+        """
+        if self.wire_format == 'json' and not self.delta:
+            return json.dumps(result).encode('utf-8')
+
+        if timestamp is None:
+            timestamp = datetime.fromisoformat(result['timestamp']).timestamp()
+
+        records = [self._quantize(det) for det in result['detections']]
+        keyframe, upserts, removed = self._diff(records)
+        if not keyframe and not upserts and not removed:
+            return None
+
+        seq = self._seq
+        self._seq = (self._seq + 1) & 0xFFFF
+        height, width = result['frame_shape']
+
+        if self.wire_format == 'binary':
+            parts = [HEADER.pack(BINARY_VERSION, FLAG_KEYFRAME if keyframe else 0, seq,
+                                 int(timestamp * 1000), height, width,
+                                 len(upserts), len(removed))]
+            parts.extend(RECORD.pack(slot, *rec) for slot, rec in upserts)
+            parts.extend(REMOVED.pack(slot) for slot in removed)
+            return b''.join(parts)
+
+        # Upserts are flat [slot, class_id, confidence, x1, y1, x2, y2] arrays
+        return json.dumps({
+            'seq': seq,
+            'keyframe': keyframe,
+            'timestamp': result['timestamp'],
+            'frame_shape': [height, width],
+            'upserts': [(slot,) + rec for slot, rec in upserts],
+            'removed': removed
+        }, separators=(',', ':')).encode('utf-8')
+
+    def _quantize(self, det: Dict[str, Any]) -> Record:
+        class_id = self._class_ids.get(det['class'])
+        if class_id is None:
+            raise ValueError(f"Unknown class name: {det['class']}")
+        confidence = round(det['confidence'] * 255)
+        if not 0 <= confidence <= 255:
+            confidence = 0 if confidence < 0 else 255
+        x1, y1, x2, y2 = det['bbox']
+        rec = (class_id, confidence, round(x1), round(y1), round(x2), round(y2))
+        if min(rec[2:]) < INT16_MIN or max(rec[2:]) > INT16_MAX:
+            rec = (class_id, confidence,
+                   _clip_int16(x1), _clip_int16(y1), _clip_int16(x2), _clip_int16(y2))
+        return rec
+
+    def _moved(self, old: Record, new: Record) -> bool:
+        if abs(old[1] - new[1]) > self.conf_threshold:
+            return True
+        threshold = self.move_threshold
+        return (abs(old[2] - new[2]) > threshold or abs(old[3] - new[3]) > threshold
+                or abs(old[4] - new[4]) > threshold or abs(old[5] - new[5]) > threshold)
+
+    def _diff(self, records: List[Record]) -> Tuple[bool, List[Tuple[int, Record]], List[int]]:
+        """Work out the slots to upsert and remove relative to the previous message"""
+        self._frames_since_keyframe += 1
+        if (not self.delta or self._slots is None
+                or self._frames_since_keyframe >= self.keyframe_interval):
+            self._frames_since_keyframe = 0
+            self._slots = dict(enumerate(records))
+            return True, list(self._slots.items()), []
+
+        # Only objects of the same class can match, so bucket candidates by class
+        candidates: Dict[int, Dict[int, Record]] = {}
+        for slot, old in self._slots.items():
+            candidates.setdefault(old[0], {})[slot] = old
+
+        slots = {}
+        upserts = []
+        added = []
+        for rec in records:
+            same_class = candidates.get(rec[0])
+            if not same_class:
+                added.append(rec)
+                continue
+            best_slot, best_iou, moved = None, self.min_iou, True
+            for slot, old in same_class.items():
+                if not self._moved(old, rec):
+                    # Still objects are the common case and need no IoU
+                    best_slot, moved = slot, False
+                    break
+                iou = _iou(old, rec)
+                if iou >= best_iou:
+                    best_slot, best_iou = slot, iou
+            if best_slot is None:
+                added.append(rec)
+                continue
+            old = same_class.pop(best_slot)
+            if moved:
+                slots[best_slot] = rec
+                upserts.append((best_slot, rec))
+            else:
+                # Keep the last sent value so small drifts cannot accumulate
+                slots[best_slot] = old
+
+        next_slot = 0
+        for rec in added:
+            while next_slot in slots:
+                next_slot += 1
+            slots[next_slot] = rec
+            upserts.append((next_slot, rec))
+
+        self._slots = slots
+        removed = sorted(slot for same_class in candidates.values() for slot in same_class)
+        return False, upserts, removed
+
+
+class DetectionDecoder:
+    def __init__(self, class_names: Optional[Dict[int, str]] = None):
+        """
+        Decode detection payloads back into result dictionaries
+
+        Args:
+            class_names: Mapping of class ID to class name used for binary payloads
+        """
+        self.class_names = class_names or {}
+        self._slots: Optional[Dict[int, Dict[str, Any]]] = None
+        self._seq: Optional[int] = None
+
+    def decode(self, body: bytes, content_type: str = CONTENT_TYPE_JSON) -> Dict[str, Any]:
+        """
+        Decode a payload based on its Content-Type
+
+        Args:
+            body: Raw request body
+            content_type: Value of the Content-Type header
+
+        Returns:
+            Dictionary with timestamp, detections and frame_shape
+        """
+        media_type = content_type.split(';')[0].strip().lower()
+        if media_type == CONTENT_TYPE_JSON:
+            return json.loads(body)
+
+        if media_type == CONTENT_TYPE_JSON_DELTA:
+            data = json.loads(body)
+            if not isinstance(data, dict) or not DELTA_JSON_KEYS.issubset(data):
+                raise ValueError(f"Delta JSON payload must contain {sorted(DELTA_JSON_KEYS)}")
+            if (not isinstance(data['upserts'], list) or not isinstance(data['removed'], list)
+                    or not isinstance(data['frame_shape'], list) or len(data['frame_shape']) != 2):
+                raise ValueError("Malformed delta JSON payload")
+            for rec in data['upserts']:
+                if not isinstance(rec, list) or len(rec) != 7:
+                    raise ValueError(f"Malformed delta JSON upsert: {rec!r}")
+            upserts = {rec[0]: _record_to_dict(rec[1:], self.class_names)
+                       for rec in data['upserts']}
+            detections = self._apply(data['seq'], data['keyframe'], upserts, data['removed'])
+            return {
+                'timestamp': data['timestamp'],
+                'detections': detections,
+                'frame_shape': tuple(data['frame_shape'])
+            }
+
+        if media_type == CONTENT_TYPE_BINARY:
+            if len(body) < HEADER.size:
+                raise ValueError(f"Truncated binary payload: {len(body)} bytes")
+            version, flags, seq, timestamp_ms, height, width, n_upserts, n_removed = \
+                HEADER.unpack_from(body, 0)
+            if version != BINARY_VERSION:
+                raise ValueError(f"Unsupported binary payload version: {version}")
+            expected = HEADER.size + n_upserts * RECORD.size + n_removed * REMOVED.size
+            if len(body) < expected:
+                raise ValueError(f"Truncated binary payload: {len(body)} of {expected} bytes")
+            offset = HEADER.size
+            upserts = {}
+            for _ in range(n_upserts):
+                slot, *rec = RECORD.unpack_from(body, offset)
+                upserts[slot] = _record_to_dict(rec, self.class_names)
+                offset += RECORD.size
+            removed = []
+            for _ in range(n_removed):
+                removed.append(REMOVED.unpack_from(body, offset)[0])
+                offset += REMOVED.size
+            detections = self._apply(seq, bool(flags & FLAG_KEYFRAME), upserts, removed)
+            return {
+                'timestamp': datetime.fromtimestamp(timestamp_ms / 1000).isoformat(),
+                'detections': detections,
+                'frame_shape': (height, width)
+            }
+
+        raise ValueError(f"Unsupported content type: {content_type}")
+
+    def _apply(self, seq: int, keyframe: bool, upserts: Dict[int, Dict[str, Any]],
+               removed: List[int]) -> List[Dict[str, Any]]:
+        """Apply a keyframe or delta to the slot table and return all detections"""
+        if keyframe:
+            self._slots = {}
+        elif self._slots is None:
+            raise ValueError("Delta payload received before a keyframe")
+        elif seq != (self._seq + 1) & 0xFFFF:
+            # A message was lost; wait for the next keyframe to resync
+            self._slots = None
+            raise ValueError(f"Sequence gap: expected {(self._seq + 1) & 0xFFFF}, got {seq}")
+
+        self._seq = seq
+        for slot in removed:
+            self._slots.pop(slot, None)
+        self._slots.update(upserts)
+        return [self._slots[slot] for slot in sorted(self._slots)]
+
+
+def _record_to_dict(rec, class_names: Dict[int, str]) -> Dict[str, Any]:
+    class_id, confidence, x1, y1, x2, y2 = rec
+    return {
+        'class': class_names.get(class_id, str(class_id)),
+        'confidence': round(confidence / 255, 3),
+        'bbox': [x1, y1, x2, y2]
+    }